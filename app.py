@@ -2,9 +2,11 @@ from flask import Flask, render_template, request, redirect, url_for, session
 import os
 import json
 import uuid
+import threading
 
 from preload_database_lance import create_or_reset_collection, preload_fields_from_json, load_bot_instructions
 from chat_bot import summarize_with_gpt, query_nullable_fields, query_required_fields, query_all_field_info, get_bot_instructions
+from maintenance import start_maintenance_thread
 
 app = Flask(__name__, static_folder="static")
 app.secret_key = os.getenv("APP_KEY")
@@ -12,8 +14,32 @@ UPLOAD_FOLDER = 'uploaded'
 SESSION_KEY = os.getenv("SESSION_KEY", "uploaded_file")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Global table
+# Global table and the upload it was built from. Hold table_lock while
+# using the table so background maintenance never runs in the middle.
 table = None
+current_upload = None
+table_lock = threading.Lock()
+
+# Background compaction / version pruning / upload cleanup, e.g. MAINTENANCE_INTERVAL=3600
+maintenance_started = False
+
+@app.before_request
+def start_maintenance_once():
+    # Started on the first request so only the serving process runs it (not the reloader parent)
+    global maintenance_started
+    if maintenance_started or not os.getenv("MAINTENANCE_INTERVAL"):
+        return
+    with table_lock:
+        if maintenance_started:
+            return
+        maintenance_started = True
+    start_maintenance_thread(
+        float(os.getenv("MAINTENANCE_INTERVAL")),
+        keep_uploads=lambda: [current_upload],
+        get_table=lambda: table,
+        lock=table_lock,
+        upload_folder=UPLOAD_FOLDER
+    )
 
 @app.before_request
 def clear_session_on_first_visit():
@@ -23,7 +49,7 @@ def clear_session_on_first_visit():
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    global table
+    global table, current_upload
 
     if request.method == "POST":
         file = request.files["file"]
@@ -38,9 +64,11 @@ def index():
             session["uploaded"] = True
 
             # Preload database
-            table = create_or_reset_collection()
             with open(filepath, "r") as f:
                 payload = json.load(f)
+            with table_lock:
+                current_upload = filepath
+                table = create_or_reset_collection()
                 preload_fields_from_json(table, payload)
                 load_bot_instructions(table)
 
@@ -50,7 +78,7 @@ def index():
 
 @app.route("/chat", methods=["GET", "POST"])
 def chat():
-    global table
+    global table, current_upload
 
     questions = {
         "1": "Show all fields with null or placeholder values",
@@ -63,11 +91,14 @@ def chat():
     selected = ""
 
     # Rebuild table if not available (e.g., on fresh request)
-    if not table and SESSION_KEY in session:
+    # (the upload may have been removed by maintenance)
+    if not table and SESSION_KEY in session and os.path.exists(session[SESSION_KEY]):
         filepath = session[SESSION_KEY]
-        table = create_or_reset_collection()
         with open(filepath, "r") as f:
             payload = json.load(f)
+        with table_lock:
+            current_upload = filepath
+            table = create_or_reset_collection()
             preload_fields_from_json(table, payload)
             load_bot_instructions(table)
 
@@ -77,21 +108,24 @@ def chat():
         if not table:
             answer = "No JSON has been uploaded yet."
         else:
-            instructions = get_bot_instructions(table)
-            if selected == "1":
-                results_df = query_nullable_fields(table)
-                answer = summarize_with_gpt(questions[selected], results_df, instructions)
-            elif selected == "2":
-                results_df = query_required_fields(table)
-                answer = summarize_with_gpt(questions[selected], results_df, instructions)
-            elif selected == "3":
-                results_df = query_all_field_info(table)
+            # Read from the table under the lock, call GPT outside it
+            results_df = None
+            with table_lock:
+                # A maintenance pass from another process may have pruned our version
+                table.checkout_latest()
+                instructions = get_bot_instructions(table)
+                if selected == "1":
+                    results_df = query_nullable_fields(table)
+                elif selected == "2":
+                    results_df = query_required_fields(table)
+                elif selected == "3":
+                    results_df = query_all_field_info(table)
+                elif selected == "4":
+                    nulls = query_nullable_fields(table)
+                    missing = query_required_fields(table)
+                    results_df = nulls._append(missing, ignore_index=True)
+            if results_df is not None:
                 answer = summarize_with_gpt(questions[selected], results_df, instructions)
-            elif selected == "4":
-                nulls = query_nullable_fields(table)
-                missing = query_required_fields(table)
-                combined = nulls._append(missing, ignore_index=True)
-                answer = summarize_with_gpt(questions[selected], combined, instructions)
 
     return render_template("chat.html", uploaded=True, questions=questions, selected=selected, answer=answer, filename=session.get("filename"))
 
@@ -0,0 +1,318 @@
+'''
+File: batch_report.py
+Author: Lucy Kien
+
+Python module to run QC checks over many payloads at once and write a
+consolidated CSV, Parquet or HTML report.
+
+Usage:
+    python batch_report.py <payload_dir_or_jsonl> -o report.csv [--workers 8]
+                           [--summaries --concurrency 4]
+'''
+
+import argparse
+import asyncio
+import json
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from geometry_utils import is_geometry, summarize_geometry
+from qc_rules import infer_field_type, flatten_json, is_null_value, find_missing_fields
+
+# Reading payloads
+# ----------------
+
+def _first_feature(data):
+    """Uploads are a list of features; QC runs on the first one like the web app."""
+    if isinstance(data, list):
+        return data[0] if data else {}
+    return data
+
+def iter_payloads(source):
+    """
+    Yield (payload_id, payload, error) tuples from a directory of JSON files or a JSONL file.
+
+    A file or line that cannot be parsed is yielded with payload None and the
+    parse error, so one bad submission does not stop the batch.
+
+    Parameters:
+        - source (str): Directory containing *.json uploads, or a .jsonl file with one payload per line.
+
+    Returns:
+        - generator of (str, dict | None, str) tuples.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(source, name), "r") as f:
+                    yield name, _first_feature(json.load(f)), ""
+            except (OSError, ValueError) as e:
+                yield name, None, f"{e.__class__.__name__}: {e}"
+    else:
+        with open(source, "r") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                payload_id = f"{os.path.basename(source)}:{line_no}"
+                try:
+                    yield payload_id, _first_feature(json.loads(line)), ""
+                except ValueError as e:
+                    yield payload_id, None, f"{e.__class__.__name__}: {e}"
+
+# Computing findings
+# ------------------
+
+def _empty_record(payload_id, error=""):
+    return {
+        "payload_id": payload_id,
+        "error": error,
+        "field_count": 0,
+        "null_count": 0,
+        "missing_count": 0,
+        "geometry_issue_count": 0,
+        "null_fields": "",
+        "missing_fields": "",
+        "geometry_issues": "",
+        "type_summary": "",
+    }
+
+def analyze_payload(item):
+    """
+    Compute the null, missing and type findings for a single payload.
+
+    Parameters:
+        - item (tuple): (payload_id, payload, error) as produced by iter_payloads().
+
+    Returns:
+        - dict: One report record for the payload. Failures are recorded in its error column.
+    """
+    payload_id, payload, error = item
+    if error:
+        return _empty_record(payload_id, error)
+    if not isinstance(payload, dict):
+        return _empty_record(payload_id, f"Expected a JSON object, got {type(payload).__name__}")
+
+    try:
+        flat_fields = flatten_json(payload)
+        null_fields = []
+        geometry_issues = []
+        type_counts = Counter()
+        seen = set()
+
+        for path, value in flat_fields:
+            if path in seen or path.startswith("applyEdits"):
+                continue
+            seen.add(path)
+
+            if is_geometry(value):
+                type_counts["geometry"] += 1
+                geom = summarize_geometry(value)
+                geometry_issues.extend(f"{path}: {issue}" for issue in geom["issues"])
+                continue
+
+            type_counts[infer_field_type(value)] += 1
+            if is_null_value(value):
+                null_fields.append(path)
+
+        missing_fields = sorted(find_missing_fields(flat_fields))
+    except Exception as e:
+        return _empty_record(payload_id, f"{e.__class__.__name__}: {e}")
+
+    record = _empty_record(payload_id)
+    record.update({
+        "field_count": len(seen),
+        "null_count": len(null_fields),
+        "missing_count": len(missing_fields),
+        "geometry_issue_count": len(geometry_issues),
+        "null_fields": "; ".join(null_fields),
+        "missing_fields": "; ".join(missing_fields),
+        "geometry_issues": "; ".join(geometry_issues),
+        "type_summary": "; ".join(f"{t}={n}" for t, n in sorted(type_counts.items())),
+    })
+    return record
+
+def analyze_payloads(source, workers=None):
+    """
+    Analyze every payload in source across a pool of worker processes.
+
+    Parameters:
+        - source (str): Directory or JSONL file (see iter_payloads()).
+        - workers (int): Number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        - list[dict]: Report records in input order.
+    """
+    if workers == 1:
+        return [analyze_payload(item) for item in iter_payloads(source)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(analyze_payload, iter_payloads(source), chunksize=16))
+
+# LLM summaries
+# -------------
+
+def build_summary_prompt(record):
+    return f"""
+    You are a QC assistant trained to validate tower inspection fields.
+    Summarize the data quality issues in this submission in 2-3 sentences. Only use the findings below.
+
+    - Fields with null or placeholder values: {record['null_fields'] or 'none'}
+    - Missing required fields: {record['missing_fields'] or 'none'}
+    - Geometry issues: {record['geometry_issues'] or 'none'}
+    - Field types: {record['type_summary']}
+
+    Summary:
+    """
+
+def _retry_delay(error, attempt, base_delay):
+    """Use the server's Retry-After header when present, otherwise exponential backoff with jitter."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return base_delay * (2 ** attempt) + random.uniform(0, base_delay)
+
+async def summarize_record(client, record, semaphore, max_retries=5, base_delay=1.0):
+    """
+    Generate an LLM summary for one report record, retrying on rate limits and transient errors.
+
+    Parameters:
+        - client (openai.AsyncOpenAI): Async OpenAI client.
+        - record (dict): Report record from analyze_payload().
+        - semaphore (asyncio.Semaphore): Bounds the number of in-flight requests.
+        - max_retries (int): Retries before giving up on this record.
+        - base_delay (float): Initial backoff in seconds.
+
+    Returns:
+        - str: The summary, or an error note if the request failed.
+    """
+    import openai
+
+    retryable = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError)
+    prompt = build_summary_prompt(record)
+
+    for attempt in range(max_retries + 1):
+        async with semaphore:
+            try:
+                response = await client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.4,
+                    max_tokens=200,
+                )
+                return response.choices[0].message.content.strip()
+            except retryable as e:
+                if attempt == max_retries:
+                    return f"Summary failed: {e.__class__.__name__}"
+                delay = _retry_delay(e, attempt, base_delay)
+            except openai.OpenAIError as e:
+                # Bad request, auth, etc. - retrying will not help
+                return f"Summary failed: {e.__class__.__name__}: {e}"
+        # Sleep outside the semaphore so other requests can proceed
+        await asyncio.sleep(delay)
+
+async def summarize_records(records, concurrency=4, max_retries=5):
+    """
+    Add an llm_summary to every record with at most `concurrency` requests in flight.
+
+    Failures are written to llm_summary instead of raised, so the findings
+    are always kept. Records that failed analysis are not summarized.
+    """
+    for record in records:
+        record["llm_summary"] = ""
+    pending = [r for r in records if not r["error"]]
+    if not pending:
+        return records
+
+    try:
+        from openai import AsyncOpenAI
+
+        # Retries are handled in summarize_record so the backoff honours our limits
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    except Exception as e:
+        for record in pending:
+            record["llm_summary"] = f"Summary failed: {e.__class__.__name__}: {e}"
+        return records
+
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        summaries = await asyncio.gather(
+            *(summarize_record(client, r, semaphore, max_retries=max_retries) for r in pending),
+            return_exceptions=True
+        )
+    finally:
+        await client.close()
+
+    for record, summary in zip(pending, summaries):
+        if isinstance(summary, BaseException):
+            summary = f"Summary failed: {summary.__class__.__name__}: {summary}"
+        record["llm_summary"] = summary
+    return records
+
+# Writing the report
+# ------------------
+
+REPORT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".html": "html", ".htm": "html"}
+
+def report_format(output_path):
+    """Return the report format for output_path, or None if the extension is not supported."""
+    return REPORT_FORMATS.get(os.path.splitext(output_path)[1].lower())
+
+def write_report(records, output_path):
+    """
+    Write report records to CSV, Parquet or HTML based on the output file extension.
+
+    Parameters:
+        - records (list[dict]): Report records.
+        - output_path (str): Destination ending in .csv, .parquet or .html.
+
+    Returns:
+        - DataFrame: The report that was written.
+    """
+    fmt = report_format(output_path)
+    if fmt is None:
+        raise ValueError("Unsupported report format. Must be .csv, .parquet or .html.")
+
+    df = pd.DataFrame(records)
+    if fmt == "csv":
+        df.to_csv(output_path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(output_path, index=False)
+    else:
+        df.to_html(output_path, index=False)
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Run QC checks over a batch of payloads.")
+    parser.add_argument("source", help="Directory of .json payloads or a .jsonl file")
+    parser.add_argument("-o", "--output", default="qc_report.csv", help="Report path (.csv, .parquet or .html)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for QC checks")
+    parser.add_argument("--summaries", action="store_true", help="Generate an LLM summary per payload")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max concurrent LLM requests")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per LLM request")
+    args = parser.parse_args()
+    # Check before any analysis or paid LLM calls run
+    if report_format(args.output) is None:
+        parser.error("--output must end in .csv, .parquet or .html")
+
+    records = analyze_payloads(args.source, workers=args.workers)
+    try:
+        if args.summaries and records:
+            asyncio.run(summarize_records(records, concurrency=args.concurrency, max_retries=args.max_retries))
+    finally:
+        # Findings are written even if the summary step fails
+        write_report(records, args.output)
+
+    flagged = sum(1 for r in records if r["null_count"] or r["missing_count"] or r["geometry_issue_count"])
+    errors = sum(1 for r in records if r["error"])
+    print(f"✅ Wrote {len(records)} payloads to {args.output}. {flagged} with findings, {errors} errors.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+'''
+File: benchmark_backends.py
+Author: Lucy Kien
+
+Python module to time the LanceDB and Weaviate backends on the same payload.
+Start Weaviate first with weaviate_backlog/docker-compose.yml.
+
+Usage:
+    python benchmark_backends.py [payload.json] [--backends lancedb weaviate] [--db-path PATH]
+                                 [--batch-size N --concurrency N]
+'''
+
+import argparse
+import time
+
+from preload_database_lance import QC_SCHEMA, preload_fields_from_json, load_bot_instructions
+from storage_backends import LanceBackend, WeaviateBackend
+
+def make_backend(name, args):
+    if name == "lancedb":
+        return LanceBackend(args.db_path, "qc_field_rules")
+    import weaviate
+
+    return WeaviateBackend(weaviate.connect_to_local(), "qc_field_rules",
+                           batch_size=args.batch_size, concurrent_requests=args.concurrency or 2)
+
+def run_backend(backend, json_source, repeat):
+    """Reset the backend and load the payload `repeat` times. Returns (seconds, rows)."""
+    start = time.perf_counter()
+    backend.reset(QC_SCHEMA)
+    for _ in range(repeat):
+        preload_fields_from_json(backend, json_source)
+    load_bot_instructions(backend)
+    return time.perf_counter() - start, backend.count_rows()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark QC storage backends.")
+    parser.add_argument("json_source", nargs="?", default="test.json")
+    parser.add_argument("--backends", nargs="+", default=["lancedb", "weaviate"], choices=["lancedb", "weaviate"])
+    parser.add_argument("--db-path", default="./lancedb_bench", help="LanceDB directory for the benchmark table")
+    parser.add_argument("--repeat", type=int, default=10, help="Times to load the payload")
+    parser.add_argument("--batch-size", type=int, default=None, help="Weaviate fixed batch size (default: dynamic)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Weaviate concurrent batch requests; requires --batch-size (dynamic batching has no concurrency setting)")
+    args = parser.parse_args()
+    if args.concurrency is not None and not args.batch_size:
+        parser.error("--concurrency only applies to fixed-size batching; pass --batch-size too")
+
+    for name in args.backends:
+        backend = make_backend(name, args)
+        try:
+            seconds, rows = run_backend(backend, args.json_source, args.repeat)
+        finally:
+            backend.close()
+        print(f"⏱️ {name}: {rows} rows in {seconds:.2f}s ({rows / seconds:.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,14 @@ import os
 import pandas as pd
 from openai import OpenAI
 import lancedb
-from sentence_transformers import SentenceTransformer
 from query_database import get_field_value_from_json, query_nullable_fields, query_required_missing_fields, connect_to_collection, query_collection
+from query_database import encode_query, cached_search, warm_query_cache
 
 # Initialize clients
 client = OpenAI()
 client.api_key = os.getenv("OPENAI_API_KEY")
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Queries embedded on every question; precompute them once
+warm_query_cache(["bot_instruction"])
 
 # Chatbot methods
 # ---------------
@@ -31,11 +32,11 @@ def query_all_field_info(table):
     return df[["field_name", "expected_format", "field_category", "field_key_type", "required", "bot_response"]]
 
 def get_bot_instructions(table, limit=15):
-    instruction_rows = (
-        table.search(embedding_model.encode("bot_instruction").tolist())
-        .where("field_name = 'bot_instruction'")
-        .limit(limit)
-        .to_pandas()
+    instruction_rows = cached_search(
+        table,
+        encode_query("bot_instruction"),
+        top_k=limit,
+        where="field_name = 'bot_instruction'"
     )
     return [row["bot_response"] for _, row in instruction_rows.iterrows()]
 
@@ -0,0 +1,221 @@
+'''
+File: geometry_utils.py
+Author: Lucy Kien
+
+Python module to detect ESRI geometry subtrees and compact them into WKB
+with precomputed summary stats.
+'''
+
+import struct
+import numpy as np
+
+# WKB geometry type codes (2D)
+WKB_POINT = 1
+WKB_LINESTRING = 2
+WKB_POLYGON = 3
+WKB_MULTIPOINT = 4
+WKB_MULTILINESTRING = 5
+WKB_MULTIPOLYGON = 6
+
+def is_geometry(obj):
+    """Return True if obj looks like an ESRI JSON geometry (point, multipoint, polyline or polygon)."""
+    if not isinstance(obj, dict):
+        return False
+    if "x" in obj and "y" in obj:
+        return True
+    return any(isinstance(obj.get(key), list) for key in ("points", "paths", "rings"))
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _coords(part):
+    """Convert a list of [x, y, (z, m)] vertices to an (n, 2) float64 array. Non-list parts become empty."""
+    if not isinstance(part, (list, tuple)):
+        return np.empty((0, 2), dtype=np.float64)
+    try:
+        arr = np.asarray(part, dtype=np.float64)
+    except (TypeError, ValueError):
+        arr = None
+    if arr is None or arr.ndim != 2 or (arr.size and arr.shape[1] < 2):
+        # Mixed z/m dimensions, null or non-numeric vertices; keep x/y only
+        arr = np.array(
+            [[_to_float(v) for v in (list(p[:2]) + [None, None])[:2]]
+             if isinstance(p, (list, tuple)) else [np.nan, np.nan] for p in part],
+            dtype=np.float64
+        )
+    if arr.size == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    return np.ascontiguousarray(arr[:, :2])
+
+def _wkb_header(wkb_type):
+    return struct.pack("<BI", 1, wkb_type)
+
+def _wkb_point(xy):
+    return _wkb_header(WKB_POINT) + np.asarray(xy, dtype="<f8").tobytes()
+
+def _wkb_ring(coords):
+    return struct.pack("<I", len(coords)) + coords.astype("<f8", copy=False).tobytes()
+
+def _wkb_polygon(rings):
+    return _wkb_header(WKB_POLYGON) + struct.pack("<I", len(rings)) + b"".join(_wkb_ring(r) for r in rings)
+
+def _signed_area(ring):
+    """Shoelace area; negative for clockwise rings (ESRI exterior rings)."""
+    if len(ring) < 3:
+        return 0.0
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+def _group_rings(rings, issues):
+    """
+    Group ESRI polygon rings into polygons by orientation.
+
+    Clockwise rings start a new polygon and counter-clockwise rings are
+    treated as holes of the nearest preceding exterior ring. Holes are not
+    tested for containment, so rings listed out of order may be attached to
+    the wrong exterior.
+    """
+    polygons = []
+    for ring in rings:
+        if _signed_area(ring) < 0 or not polygons:
+            if _signed_area(ring) > 0:
+                issues.append("first ring is not clockwise")
+            polygons.append([ring])
+        else:
+            polygons[-1].append(ring)
+    return polygons
+
+def _null_part_issues(raw_parts, label, issues):
+    """Flag parts that are not vertex lists. Returns their indexes."""
+    null_parts = set()
+    for i, part in enumerate(raw_parts):
+        if not isinstance(part, (list, tuple)):
+            issues.append(f"{label} {i} is null")
+            null_parts.add(i)
+    return null_parts
+
+def summarize_geometry(geometry):
+    """
+    Compact an ESRI geometry into WKB and compute its summary stats.
+
+    Parameters:
+        - geometry (dict): ESRI JSON geometry.
+
+    Returns:
+        - dict with keys:
+            type (str): point, multipoint, polyline or polygon.
+            wkb (bytes): Little-endian WKB encoding of the geometry. Polygons with
+                more than one clockwise (exterior) ring are encoded as MultiPolygon.
+            bbox (list[float] | None): [xmin, ymin, xmax, ymax], None if empty.
+            vertex_count (int): Total number of vertices.
+            part_count (int): Number of points, paths or rings.
+            is_valid (bool): Whether the geometry passed the basic checks.
+            issues (list[str]): Reasons the geometry is invalid.
+    """
+    issues = []
+
+    if "x" in geometry and "y" in geometry:
+        geom_type = "point"
+        x, y = geometry.get("x"), geometry.get("y")
+        empty = x is None or y is None
+        parts = [] if empty else [_coords([[x, y]])]
+        wkb = _wkb_point(parts[0][0] if parts else [np.nan, np.nan])
+    elif isinstance(geometry.get("points"), list):
+        geom_type = "multipoint"
+        parts = [_coords(geometry["points"])]
+        wkb = (_wkb_header(WKB_MULTIPOINT) + struct.pack("<I", len(parts[0]))
+               + b"".join(_wkb_point(xy) for xy in parts[0]))
+    elif isinstance(geometry.get("paths"), list):
+        geom_type = "polyline"
+        null_parts = _null_part_issues(geometry["paths"], "path", issues)
+        parts = [_coords(path) for path in geometry["paths"]]
+        wkb = (_wkb_header(WKB_MULTILINESTRING) + struct.pack("<I", len(parts))
+               + b"".join(_wkb_header(WKB_LINESTRING) + _wkb_ring(path) for path in parts))
+        for i, path in enumerate(parts):
+            if i not in null_parts and len(path) < 2:
+                issues.append(f"path {i} has fewer than 2 vertices")
+    else:
+        geom_type = "polygon"
+        raw_rings = geometry.get("rings") if isinstance(geometry.get("rings"), list) else []
+        null_parts = _null_part_issues(raw_rings, "ring", issues)
+        parts = [_coords(ring) for ring in raw_rings]
+        polygons = _group_rings([r for i, r in enumerate(parts) if i not in null_parts], issues)
+        if len(polygons) > 1:
+            wkb = (_wkb_header(WKB_MULTIPOLYGON) + struct.pack("<I", len(polygons))
+                   + b"".join(_wkb_polygon(rings) for rings in polygons))
+        else:
+            wkb = _wkb_polygon(polygons[0] if polygons else [])
+        for i, ring in enumerate(parts):
+            if i in null_parts:
+                continue
+            if len(ring) < 4:
+                issues.append(f"ring {i} has fewer than 4 vertices")
+            elif not np.array_equal(ring[0], ring[-1]):
+                issues.append(f"ring {i} is not closed")
+
+    vertex_count = sum(len(p) for p in parts)
+    bbox = None
+    if vertex_count:
+        coords = np.concatenate(parts)
+        finite = coords[np.isfinite(coords).all(axis=1)]
+        if len(finite) < len(coords):
+            issues.append("contains null or non-finite coordinates")
+        if len(finite):
+            bbox = [float(v) for v in np.concatenate([finite.min(axis=0), finite.max(axis=0)])]
+    else:
+        issues.append("geometry is empty")
+
+    return {
+        "type": geom_type,
+        "wkb": wkb,
+        "bbox": bbox,
+        "vertex_count": int(vertex_count),
+        "part_count": len(parts),
+        "is_valid": not issues,
+        "issues": issues,
+    }
+
+def compact_geometry(obj, summaries=None):
+    """
+    Return a copy of a payload with each geometry subtree replaced by its summary.
+
+    Geometries are matched the same way flatten_json() does (a "geometry" key
+    holding an ESRI geometry), so stored payloads no longer carry coordinates.
+
+    Parameters:
+        - obj: Parsed JSON payload.
+        - summaries (dict): Optional cache; filled with id(geometry) -> summarize_geometry() result.
+
+    Returns:
+        - The compacted copy of obj.
+    """
+    if isinstance(obj, dict):
+        compacted = {}
+        for k, v in obj.items():
+            if k == "geometry" and is_geometry(v):
+                summary = summarize_geometry(v)
+                if summaries is not None:
+                    summaries[id(v)] = summary
+                compacted[k] = {
+                    "type": summary["type"],
+                    "bbox": summary["bbox"],
+                    "vertex_count": summary["vertex_count"],
+                    "part_count": summary["part_count"],
+                    "is_valid": summary["is_valid"],
+                }
+            else:
+                compacted[k] = compact_geometry(v, summaries)
+        return compacted
+    if isinstance(obj, list):
+        return [compact_geometry(v, summaries) for v in obj]
+    return obj
+
+def describe_geometry(summary):
+    """Return a short human-readable description of a summarize_geometry() result."""
+    text = f"{summary['type']}: {summary['part_count']} part(s), {summary['vertex_count']} vertices"
+    if summary["bbox"]:
+        text += ", bbox [" + ", ".join(f"{v:.6f}" for v in summary["bbox"]) + "]"
+    return text
@@ -0,0 +1,239 @@
+'''
+File: maintenance.py
+Author: Lucy Kien
+
+Python module to keep the LanceDB store and upload folder from growing
+without bound. Compacts fragments, optimizes indexes, prunes old table
+versions, removes stale uploads and reports before/after sizes and scan
+times. Can run once from the command line or on an interval in a
+background thread.
+
+Usage:
+    python maintenance.py [--retention-hours 24] [--upload-max-age-hours 24] [--interval 3600]
+
+When the web app is running, prefer its built-in thread (MAINTENANCE_INTERVAL)
+over this CLI. The app moves its table to the latest version before each
+read, so pruning from a separate process is safe. However, the CLI cannot
+see which upload the app is serving. It only keeps the newest upload, so
+with several active sessions an older session's file can still be removed.
+'''
+
+import argparse
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+
+import lancedb
+
+DEFAULT_DB_PATH = "./lancedb"
+DEFAULT_COLLECTION = "qc_field_rules"
+DEFAULT_UPLOAD_FOLDER = "uploaded"
+
+def dir_size(path):
+    """Return the total size in bytes of all files under path."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def time_scan(table, repeats=3, column="field_name"):
+    """
+    Return the fastest scan time in milliseconds over `repeats` runs.
+
+    Only one column is read so the probe measures fragment overhead without
+    loading vectors and payloads while the app waits on the table lock.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        table.search().select([column]).limit(None).to_arrow()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def table_stats(table, table_path):
+    """Collect size, row, version and scan-time stats for a table."""
+    return {
+        "size_bytes": dir_size(table_path),
+        "rows": table.count_rows(),
+        "versions": len(table.list_versions()),
+        "scan_ms": time_scan(table),
+    }
+
+def optimize_table(table, retention):
+    """
+    Compact small fragments, optimize indexes and prune versions older than the retention period.
+
+    Parameters:
+        - table: LanceDB table.
+        - retention (timedelta): Versions older than this are removed.
+    """
+    if hasattr(table, "optimize"):
+        table.optimize(cleanup_older_than=retention)
+    else:
+        # Older lancedb releases expose the steps separately
+        table.compact_files()
+        table.cleanup_old_versions(older_than=retention)
+
+def cleanup_uploads(upload_folder, max_age, keep=(), keep_newest=False):
+    """
+    Delete uploaded files older than max_age, except the ones in keep.
+
+    Parameters:
+        - upload_folder (str): Folder the web app saves uploads into.
+        - max_age (timedelta): Minimum age of files to delete.
+        - keep (iterable of str): Paths still in use.
+        - keep_newest (bool): Also keep the most recent upload (for callers that cannot see the app's state).
+
+    Returns:
+        - (int, int): Number of files removed and bytes freed.
+    """
+    if not os.path.isdir(upload_folder):
+        return 0, 0
+
+    keep = {os.path.abspath(p) for p in keep if p}
+    if keep_newest:
+        files = [os.path.join(upload_folder, n) for n in os.listdir(upload_folder)]
+        files = [f for f in files if os.path.isfile(f)]
+        if files:
+            keep.add(os.path.abspath(max(files, key=os.path.getmtime)))
+    cutoff = time.time() - max_age.total_seconds()
+    removed, freed = 0, 0
+
+    for name in os.listdir(upload_folder):
+        path = os.path.abspath(os.path.join(upload_folder, name))
+        if path in keep or not os.path.isfile(path):
+            continue
+        try:
+            stat = os.stat(path)
+            if stat.st_mtime < cutoff:
+                os.remove(path)
+                removed += 1
+                freed += stat.st_size
+        except OSError:
+            pass
+    return removed, freed
+
+def run_maintenance(db_path=DEFAULT_DB_PATH, collection_name=DEFAULT_COLLECTION,
+                    upload_folder=DEFAULT_UPLOAD_FOLDER, retention=timedelta(hours=24),
+                    upload_max_age=timedelta(hours=24), keep_uploads=(), get_table=None, lock=None,
+                    keep_newest_upload=False):
+    """
+    Run one maintenance pass over the table and upload folder.
+
+    Inside the web app, pass a getter for the app's own table handle and the
+    lock the app holds while using it. The pass then works on that handle and
+    moves it to the latest version, so the app never reads a version that
+    has been pruned.
+
+    Parameters:
+        - db_path (str): Path to the LanceDB directory.
+        - collection_name (str): Name of the LanceDB table.
+        - upload_folder (str): Folder with uploaded payloads.
+        - retention (timedelta): Table versions older than this are pruned.
+        - upload_max_age (timedelta): Uploads older than this are deleted.
+        - keep_uploads (iterable of str): Upload paths that must not be deleted.
+        - get_table (callable): Returns the open table to maintain (or None) instead of opening db_path/collection_name.
+        - lock (threading.Lock): Held for the whole table pass; the app holds it while using the table.
+        - keep_newest_upload (bool): Never delete the most recent upload.
+
+    Returns:
+        - report (dict): Before/after table stats and upload cleanup results.
+    """
+    report = {"table": None}
+
+    with lock or nullcontext():
+        table = get_table() if get_table else None
+        if table is None:
+            db = lancedb.connect(db_path)
+            if collection_name in db.table_names():
+                table = db.open_table(collection_name)
+
+        if table is not None:
+            table_path = os.path.join(db_path, f"{table.name}.lance")
+
+            # Pick up writes from other handles so only versions older than ours are pruned
+            table.checkout_latest()
+            before = table_stats(table, table_path)
+            optimize_table(table, retention)
+            table.checkout_latest()
+            after = table_stats(table, table_path)
+            report["table"] = {"before": before, "after": after}
+
+    removed, freed = cleanup_uploads(upload_folder, upload_max_age, keep_uploads, keep_newest_upload)
+    report["uploads_removed"] = removed
+    report["upload_bytes_freed"] = freed
+    return report
+
+def print_report(report):
+    stats = report["table"]
+    if stats:
+        before, after = stats["before"], stats["after"]
+        print(f"🧹 Table size: {before['size_bytes'] / 1e6:.2f} MB -> {after['size_bytes'] / 1e6:.2f} MB")
+        print(f"🧹 Versions: {before['versions']} -> {after['versions']}, rows: {after['rows']}")
+        print(f"🧹 field_name scan: {before['scan_ms']:.1f} ms -> {after['scan_ms']:.1f} ms")
+    else:
+        print("🧹 No table found, skipped compaction.")
+    print(f"🧹 Removed {report['uploads_removed']} uploads ({report['upload_bytes_freed'] / 1e6:.2f} MB)")
+
+def start_maintenance_thread(interval_seconds, keep_uploads=lambda: (), **kwargs):
+    """
+    Run maintenance every interval_seconds in a daemon thread.
+
+    Parameters:
+        - interval_seconds (float): Seconds between passes.
+        - keep_uploads (callable): Returns the upload paths in use at the time of each pass.
+        - **kwargs: Passed through to run_maintenance(), e.g. get_table and lock.
+
+    Returns:
+        - stop_event (threading.Event): Set it to stop the thread.
+    """
+    stop_event = threading.Event()
+
+    def loop():
+        while not stop_event.wait(interval_seconds):
+            try:
+                print_report(run_maintenance(keep_uploads=keep_uploads(), **kwargs))
+            except Exception as e:
+                # The table can be dropped and recreated by an upload mid-pass; try again next time
+                print(f"⚠️ Maintenance pass failed: {e}")
+
+    threading.Thread(target=loop, name="lancedb-maintenance", daemon=True).start()
+    return stop_event
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact and clean up the QC LanceDB store.")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH)
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION)
+    parser.add_argument("--upload-folder", default=DEFAULT_UPLOAD_FOLDER)
+    parser.add_argument("--retention-hours", type=float, default=24, help="Keep table versions newer than this")
+    parser.add_argument("--upload-max-age-hours", type=float, default=24, help="Delete uploads older than this")
+    parser.add_argument("--interval", type=float, default=None, help="Repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    options = dict(
+        db_path=args.db_path,
+        collection_name=args.collection,
+        upload_folder=args.upload_folder,
+        retention=timedelta(hours=args.retention_hours),
+        upload_max_age=timedelta(hours=args.upload_max_age_hours),
+        # This process cannot see the app's current upload; never delete the newest one
+        keep_newest_upload=True,
+    )
+
+    print_report(run_maintenance(**options))
+    if args.interval:
+        start_maintenance_thread(args.interval, **options)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
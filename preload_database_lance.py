@@ -5,86 +5,95 @@ Author: Lucy Kien
 Python module to preload the database into a LanceDB collection.
 '''
 
-import lancedb
 from sentence_transformers import SentenceTransformer
 import os
 import json
-import pandas as pd
+import numpy as np
+import pyarrow as pa
+from geometry_utils import is_geometry, summarize_geometry, compact_geometry, describe_geometry
+from storage_backends import LanceBackend
+from qc_rules import infer_field_type, infer_key_type, flatten_json, is_null_value, find_missing_fields
 
 # Initialize your embedding model
 embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-def infer_field_type(value):
-    if value is None:
-        return "null"
-    if isinstance(value, bool):
-        return "boolean"
-    elif isinstance(value, int):
-        return "number"
-    elif isinstance(value, float):
-        return "float"
-    elif isinstance(value, str):
-        return "text"
-    elif isinstance(value, list):
-        return "list"
-    elif isinstance(value, dict):
-        return "object"
-    return "unknown"
-
-def infer_key_type(field_name):
-    fname = field_name.lower()
-    if "id" in fname:
-        return "identifier"
-    elif "time" in fname or "date" in fname:
-        return "timestamp"
-    elif "email" in fname:
-        return "contact"
-    return "general"
-
-def flatten_json(obj, parent_key='', sep='.'):
-    items = []
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            items.extend(flatten_json(v, new_key, sep=sep))
-    elif isinstance(obj, list):
-        for i, v in enumerate(obj):
-            new_key = f"{parent_key}[{i}]"
-            items.extend(flatten_json(v, new_key, sep=sep))
-    else:
-        items.append((parent_key, obj))
-    return items
+EMBEDDING_DIM = embedding_model.get_sentence_embedding_dimension()
+
+# Arrow schema for the QC table. The vector column is a fixed-size float32 list
+# so embeddings can be handed to LanceDB without round-tripping through Python
+# floats. Text columns stay plain strings; Lance compresses repeated values on
+# disk and readers get ordinary object columns back.
+QC_SCHEMA = pa.schema([
+    pa.field("field_name", pa.string()),
+    pa.field("expected_format", pa.string()),
+    pa.field("validation_type", pa.string()),
+    pa.field("bot_response", pa.string()),
+    pa.field("example_value", pa.string()),
+    pa.field("field_category", pa.string()),
+    pa.field("priority_level", pa.string()),
+    pa.field("acceptable_values", pa.string()),
+    pa.field("required", pa.bool_()),
+    pa.field("field_key_type", pa.string()),
+    pa.field("was_null", pa.bool_()),
+    pa.field("vector", pa.list_(pa.float32(), EMBEDDING_DIM)),
+    pa.field("raw_payload", pa.string()),
+    # Compacted geometry; null for non-geometry rows
+    pa.field("geometry_wkb", pa.binary()),
+    pa.field("geometry_bbox", pa.list_(pa.float64(), 4)),
+    pa.field("geometry_vertex_count", pa.int32()),
+])
+
+def new_columns():
+    """Return an empty column buffer for every non-vector field in QC_SCHEMA."""
+    return {field.name: [] for field in QC_SCHEMA if field.name != "vector"}
+
+def append_row(columns, vector_texts, vector_text, **values):
+    """Append one row to column buffers; columns not given are stored as null."""
+    for name, column in columns.items():
+        column.append(values.get(name))
+    vector_texts.append(vector_text)
+
+def embed_texts(texts):
+    """
+    Encode texts in one batch and wrap the matrix as an Arrow vector column.
+
+    Parameters:
+        - texts (list[str]): Texts to embed, one per row.
+
+    Returns:
+        - pa.FixedSizeListArray: float32 vectors backed by the NumPy buffer.
+    """
+    matrix = embedding_model.encode(texts, convert_to_numpy=True)
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32).reshape(len(texts), EMBEDDING_DIM)
+    return pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), EMBEDDING_DIM)
+
+def build_record_batch(columns, vector_texts):
+    """
+    Build a record batch matching QC_SCHEMA from column buffers.
+
+    Parameters:
+        - columns (dict): Column name -> list of values (see new_columns()).
+        - vector_texts (list[str]): Text to embed for each row.
+
+    Returns:
+        - pa.RecordBatch: Batch ready for table.add().
+    """
+    arrays = []
+    for field in QC_SCHEMA:
+        if field.name == "vector":
+            arrays.append(embed_texts(vector_texts))
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=QC_SCHEMA)
+
+def add_columns(table, columns, vector_texts):
+    """Append column buffers as a single Arrow batch to a LanceDB table or StorageBackend."""
+    batch = build_record_batch(columns, vector_texts)
+    table.add(pa.Table.from_batches([batch]))
+    return batch.num_rows
 
 def create_or_reset_collection(db_path="./lancedb", collection_name="qc_field_rules"):
     """Create or reset the LanceDB collection."""
-    db = lancedb.connect(db_path)
-
-    if collection_name in db.table_names():
-        db.drop_table(collection_name)
-
-    table = db.create_table(
-        collection_name,
-        data=[
-            {
-                "field_name": "",
-                "expected_format": "",
-                "validation_type": "",
-                "bot_response": "",
-                "example_value": "",
-                "field_category": "",
-                "priority_level": "low",
-                "acceptable_values": "",
-                "required": False,
-                "field_key_type": "",
-                "was_null": False,
-                "vector": [0.0] * embedding_model.get_sentence_embedding_dimension(),
-                "raw_payload": ""
-            }
-        ],
-        mode="overwrite"
-    )
-
-    return table
+    return LanceBackend(db_path, collection_name).reset(QC_SCHEMA).table
 
 def preload_fields_from_json(table, json_source):
     if isinstance(json_source, str):
@@ -102,62 +111,87 @@ def preload_fields_from_json(table, json_source):
         return
 
     flat_fields = flatten_json(data[0])
-    rows = []
+    # Store geometry as its summary in raw_payload; coordinates live only in geometry_wkb
+    geometry_summaries = {}
+    raw_payload = json.dumps(compact_geometry(data[0], geometry_summaries))
+    columns = new_columns()
+    vector_texts = []
     seen = set()
 
+    def add_row(vector_text, **values):
+        append_row(columns, vector_texts, vector_text, **values)
+
     for path, value in flat_fields:
         if path in seen or path.startswith("applyEdits"):
             continue
         seen.add(path)
 
-        fmt = infer_field_type(value)
         category = path.split('.')[0]
+
+        if is_geometry(value):
+            geom = geometry_summaries.get(id(value)) or summarize_geometry(value)
+            add_row(
+                f"{path} geometry {geom['type']}",
+                field_name=path,
+                expected_format="geometry",
+                validation_type="geometry_check",
+                bot_response=(
+                    f"Expected format: geometry ({geom['type']})" if geom["is_valid"]
+                    else f"⚠️ Invalid geometry: {'; '.join(geom['issues'])}"
+                ),
+                example_value=describe_geometry(geom),
+                field_category=category,
+                priority_level="low" if geom["is_valid"] else "high",
+                acceptable_values="",
+                required=False,
+                field_key_type="geometry",
+                was_null=geom["vertex_count"] == 0,
+                raw_payload=raw_payload,
+                geometry_wkb=geom["wkb"],
+                geometry_bbox=geom["bbox"],
+                geometry_vertex_count=geom["vertex_count"]
+            )
+            continue
+
+        fmt = infer_field_type(value)
         key_type = infer_key_type(path)
 
-        rows.append({
-            "field_name": path,
-            "expected_format": fmt,
-            "validation_type": "type_check",
-            "bot_response": f"Expected format: {fmt}",
-            "example_value": str(value),
-            "field_category": category,
-            "priority_level": "low",
-            "acceptable_values": "",
-            "required": False,
-            "field_key_type": key_type,
-            "was_null": (
-                value is None or 
-                (isinstance(value, str) and value.strip().lower() in ["null", "none", "n/a", "na", "", "unknown"])
-            ),
-            "vector": embedding_model.encode(f"{path} {fmt}").tolist(),
-            "raw_payload": json.dumps(data[0])
-        })
-
-    expected_fields = {"attributes.site_visit_datetime", "attributes.customer", "geometry"}
-    present_fields = {path for path, _ in flat_fields}
-    missing_fields = expected_fields - present_fields
-
-    for m in missing_fields:
-        rows.append({
-            "field_name": m,
-            "expected_format": "unknown",
-            "validation_type": "missing_check",
-            "bot_response": f"⚠️ Missing expected field: {m}",
-            "example_value": "",
-            "field_category": m.split('.')[0],
-            "priority_level": "high",
-            "acceptable_values": "",
-            "required": True,
-            "field_key_type": "required",
-            "was_null": False,
-            "vector": embedding_model.encode(f"{m} missing").tolist(),
-            "raw_payload": json.dumps(data[0])
-        })
-
-    if rows:
-        df = pd.DataFrame(rows)
-        table.add(df)
-        print(f"✅ Loaded {len(rows)} fields. Categories: {sorted(set(r['field_category'] for r in rows))}")
+        add_row(
+            f"{path} {fmt}",
+            field_name=path,
+            expected_format=fmt,
+            validation_type="type_check",
+            bot_response=f"Expected format: {fmt}",
+            example_value=str(value),
+            field_category=category,
+            priority_level="low",
+            acceptable_values="",
+            required=False,
+            field_key_type=key_type,
+            was_null=is_null_value(value),
+            raw_payload=raw_payload
+        )
+
+    for m in find_missing_fields(flat_fields):
+        add_row(
+            f"{m} missing",
+            field_name=m,
+            expected_format="unknown",
+            validation_type="missing_check",
+            bot_response=f"⚠️ Missing expected field: {m}",
+            example_value="",
+            field_category=m.split('.')[0],
+            priority_level="high",
+            acceptable_values="",
+            required=True,
+            field_key_type="required",
+            was_null=False,
+            raw_payload=raw_payload
+        )
+
+    if vector_texts:
+        add_columns(table, columns, vector_texts)
+        print(f"✅ Loaded {len(vector_texts)} fields. Categories: {sorted(set(columns['field_category']))}")
 
 def load_bot_instructions(table):
     instructions = [
@@ -180,26 +214,26 @@ def load_bot_instructions(table):
         "4. Summarize potential data quality issues"
     ]
 
-    rows = [
-        {
-            "field_name": "bot_instruction",
-            "expected_format": "text",
-            "validation_type": "guidance",
-            "bot_response": msg,
-            "example_value": "",
-            "field_category": "meta",
-            "priority_level": "high",
-            "acceptable_values": "",
-            "required": False,
-            "field_key_type": "instruction",
-            "was_null": False,
-            "vector": embedding_model.encode(msg).tolist(),
-            "raw_payload": ""
-        } for msg in instructions
-    ]
-
-    df = pd.DataFrame(rows)
-    table.add(df)
+    columns = new_columns()
+    vector_texts = []
+    for msg in instructions:
+        append_row(
+            columns, vector_texts, msg,
+            field_name="bot_instruction",
+            expected_format="text",
+            validation_type="guidance",
+            bot_response=msg,
+            example_value="",
+            field_category="meta",
+            priority_level="high",
+            acceptable_values="",
+            required=False,
+            field_key_type="instruction",
+            was_null=False,
+            raw_payload=""
+        )
+
+    add_columns(table, columns, vector_texts)
 
 def main():
     table = create_or_reset_collection()
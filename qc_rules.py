@@ -0,0 +1,70 @@
+'''
+File: qc_rules.py
+Author: Lucy Kien
+
+Python module with the field inspection rules shared by the LanceDB loader
+and the batch QC report. Kept free of model/database imports so it is cheap
+to import in worker processes.
+'''
+
+from geometry_utils import is_geometry
+
+# String values treated as null placeholders
+NULL_PLACEHOLDERS = {"null", "none", "n/a", "na", "", "unknown"}
+
+# Fields every payload is expected to carry
+EXPECTED_FIELDS = {"attributes.site_visit_datetime", "attributes.customer", "geometry"}
+
+def infer_field_type(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    elif isinstance(value, int):
+        return "number"
+    elif isinstance(value, float):
+        return "float"
+    elif isinstance(value, str):
+        return "text"
+    elif isinstance(value, list):
+        return "list"
+    elif isinstance(value, dict):
+        return "object"
+    return "unknown"
+
+def infer_key_type(field_name):
+    fname = field_name.lower()
+    if "id" in fname:
+        return "identifier"
+    elif "time" in fname or "date" in fname:
+        return "timestamp"
+    elif "email" in fname:
+        return "contact"
+    return "general"
+
+def flatten_json(obj, parent_key='', sep='.'):
+    items = []
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            new_key = f"{parent_key}{sep}{k}" if parent_key else k
+            if k == "geometry" and is_geometry(v):
+                # Keep geometry as a single leaf instead of one row per coordinate
+                items.append((new_key, v))
+                continue
+            items.extend(flatten_json(v, new_key, sep=sep))
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            new_key = f"{parent_key}[{i}]"
+            items.extend(flatten_json(v, new_key, sep=sep))
+    else:
+        items.append((parent_key, obj))
+    return items
+
+def is_null_value(value):
+    """Return True if value is None or a null placeholder string."""
+    return value is None or (isinstance(value, str) and value.strip().lower() in NULL_PLACEHOLDERS)
+
+def find_missing_fields(flat_fields, expected_fields=EXPECTED_FIELDS):
+    """Return the expected field paths not present in the flattened payload."""
+    present_fields = {path for path, _ in flat_fields}
+    return expected_fields - present_fields
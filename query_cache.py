@@ -0,0 +1,70 @@
+'''
+File: query_cache.py
+Author: Lucy Kien
+
+Python module with the search result cache used by query_database and
+chat_bot. Results are cached per table and dropped whenever the table is
+written to.
+'''
+
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+
+RESULT_CACHE_SIZE = 256          # search results kept per table
+QUERY_BUCKET_RESOLUTION = 0.02   # vectors this close share a result cache entry
+
+# Columns callers read from search results; vectors and raw_payload are not cached
+RESULT_COLUMNS = ["field_name", "bot_response", "priority_level", "required",
+                  "expected_format", "field_key_type"]
+
+_cache_lock = threading.Lock()
+_result_cache = weakref.WeakKeyDictionary()
+
+def _vector_bucket(vector):
+    return np.round(np.asarray(vector) / QUERY_BUCKET_RESOLUTION).astype(np.int16).tobytes()
+
+def cached_search(table, query_vector, top_k=10, where=None, columns=RESULT_COLUMNS):
+    """
+    Vector search with a per-table result cache.
+
+    Entries are keyed by (query vector bucket, top_k, where, columns) and are
+    dropped as soon as the table version changes, i.e. after any write to the
+    table. Only the selected columns (plus _distance) are fetched and cached.
+
+    Parameters:
+        - table: LanceDB table to query.
+        - query_vector (np.ndarray): Query embedding.
+        - top_k (int): Number of results.
+        - where (str): Optional SQL filter.
+        - columns (list[str]): Columns to return.
+
+    Returns:
+        - DataFrame with the search results.
+    """
+    version = table.version
+    key = (_vector_bucket(query_vector), top_k, where, tuple(columns))
+
+    with _cache_lock:
+        state = _result_cache.get(table)
+        if state is None or state["version"] != version:
+            state = {"version": version, "entries": OrderedDict()}
+            _result_cache[table] = state
+        entries = state["entries"]
+        if key in entries:
+            entries.move_to_end(key)
+            return entries[key].copy()
+
+    query = table.search(query_vector).select(list(columns))
+    if where:
+        query = query.where(where)
+    results = query.limit(top_k).to_pandas()
+
+    with _cache_lock:
+        # Skip caching if a newer table version replaced this state meanwhile
+        if _result_cache.get(table) is state:
+            entries[key] = results
+            while len(entries) > RESULT_CACHE_SIZE:
+                entries.popitem(last=False)
+    return results.copy()
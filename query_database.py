@@ -11,11 +11,60 @@ import pandas as pd
 from openai import OpenAI
 import os
 import json
+import threading
+from collections import OrderedDict
+import numpy as np
+from query_cache import cached_search
 # Load the embedding model
 embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
 client = OpenAI()
 client.api_key = os.getenv("OPENAI_API_KEY")
 
+# Query embedding cache (search results are cached in query_cache)
+QUERY_CACHE_SIZE = 1024          # query text -> embedding
+
+_cache_lock = threading.Lock()
+_query_embedding_cache = OrderedDict()
+
+def _store_query_embedding(text, vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    vector.flags.writeable = False
+    _query_embedding_cache[text] = vector
+    _query_embedding_cache.move_to_end(text)
+    while len(_query_embedding_cache) > QUERY_CACHE_SIZE:
+        _query_embedding_cache.popitem(last=False)
+    return vector
+
+def encode_query(text):
+    """
+    Return the embedding for a query string, using the LRU cache when possible.
+
+    Parameters:
+        - text (str): Query text.
+
+    Returns:
+        - np.ndarray: Read-only float32 embedding.
+    """
+    with _cache_lock:
+        vector = _query_embedding_cache.get(text)
+        if vector is not None:
+            _query_embedding_cache.move_to_end(text)
+            return vector
+    vector = embedding_model.encode(text, convert_to_numpy=True)
+    with _cache_lock:
+        return _store_query_embedding(text, vector)
+
+def warm_query_cache(texts):
+    """Precompute embeddings for known queries (e.g. the fixed question menu) in one batch."""
+    with _cache_lock:
+        missing = [t for t in dict.fromkeys(texts) if t not in _query_embedding_cache]
+    if not missing:
+        return
+    vectors = embedding_model.encode(missing, convert_to_numpy=True)
+    with _cache_lock:
+        for text, vector in zip(missing, vectors):
+            _store_query_embedding(text, vector)
+
 def connect_to_collection(db_path="./lancedb", collection_name="qc_field_rules"):
     """
     Connect to the LanceDB collection.
@@ -42,8 +91,8 @@ def query_collection(table, user_input, top_k=10):
     Returns:
         - DataFrame with top matching results.
     """
-    query_vector = embedding_model.encode(user_input).tolist()
-    results = table.search(query_vector).limit(top_k).to_pandas()
+    query_vector = encode_query(user_input)
+    results = cached_search(table, query_vector, top_k)
     
     filtered = results[results["field_name"] != "bot_instruction"].head(top_k)
     
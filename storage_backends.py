@@ -0,0 +1,161 @@
+'''
+File: storage_backends.py
+Author: Lucy Kien
+
+Python module with the storage backends the QC loaders write to. Every
+backend takes the Arrow schema and record batches built by
+preload_database_lance, so LanceDB and Weaviate load identical rows.
+'''
+
+import base64
+from abc import ABC, abstractmethod
+import pyarrow as pa
+
+class StorageBackend(ABC):
+    """Base class for QC table storage."""
+
+    name = "base"
+
+    @abstractmethod
+    def reset(self, schema):
+        """Create or recreate the collection for the given Arrow schema. Returns self."""
+
+    @abstractmethod
+    def add(self, data):
+        """Append a pyarrow.Table of rows (vector column included) to the collection."""
+
+    @abstractmethod
+    def count_rows(self):
+        """Return the number of rows in the collection."""
+
+    def _require_reset(self, handle):
+        if handle is None:
+            raise RuntimeError(f"{self.__class__.__name__}.reset() must be called before reading or writing")
+        return handle
+
+    def close(self):
+        pass
+
+class LanceBackend(StorageBackend):
+    """LanceDB storage; rows are appended as Arrow data without conversion."""
+
+    name = "lancedb"
+
+    def __init__(self, db_path="./lancedb", collection_name="qc_field_rules"):
+        import lancedb
+
+        self.db = lancedb.connect(db_path)
+        self.collection_name = collection_name
+        self.table = None
+
+    def reset(self, schema):
+        if self.collection_name in self.db.table_names():
+            self.db.drop_table(self.collection_name)
+        self.table = self.db.create_table(self.collection_name, schema=schema, mode="overwrite")
+        return self
+
+    def add(self, data):
+        self._require_reset(self.table).add(data)
+
+    def count_rows(self):
+        return self._require_reset(self.table).count_rows()
+
+def _weaviate_data_type(arrow_type):
+    """Map an Arrow field type to the matching Weaviate property data type."""
+    import weaviate.classes as wvc
+
+    DataType = wvc.config.DataType
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return DataType.TEXT
+    if pa.types.is_boolean(arrow_type):
+        return DataType.BOOL
+    if pa.types.is_integer(arrow_type):
+        return DataType.INT
+    if pa.types.is_floating(arrow_type):
+        return DataType.NUMBER
+    if pa.types.is_binary(arrow_type):
+        return DataType.BLOB
+    if pa.types.is_list(arrow_type) or pa.types.is_fixed_size_list(arrow_type):
+        if pa.types.is_string(arrow_type.value_type):
+            return DataType.TEXT_ARRAY
+        if pa.types.is_integer(arrow_type.value_type):
+            return DataType.INT_ARRAY
+        return DataType.NUMBER_ARRAY
+    raise ValueError(f"Unsupported Arrow type for Weaviate: {arrow_type}")
+
+class WeaviateBackend(StorageBackend):
+    """
+    Weaviate storage with bring-your-own vectors.
+
+    Parameters:
+        - client (weaviate.WeaviateClient): Connected Weaviate client.
+        - collection_name (str): Name of the collection.
+        - batch_size (int | None): Fixed batch size. None uses Weaviate's dynamic batching.
+        - concurrent_requests (int): Parallel batch requests when batch_size is set.
+        - chunk_rows (int): Rows converted to Python objects at a time while streaming.
+    """
+
+    name = "weaviate"
+
+    def __init__(self, client, collection_name="qc_field_rules", batch_size=None,
+                 concurrent_requests=2, chunk_rows=1024):
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.concurrent_requests = concurrent_requests
+        self.chunk_rows = chunk_rows
+        self.collection = None
+
+    def reset(self, schema):
+        import weaviate.classes as wvc
+
+        if self.client.collections.exists(self.collection_name):
+            self.client.collections.delete(self.collection_name)
+
+        self.collection = self.client.collections.create(
+            name=self.collection_name,
+            properties=[
+                wvc.config.Property(name=field.name, data_type=_weaviate_data_type(field.type))
+                for field in schema if field.name != "vector"
+            ],
+            # Vectors come from the local embedding model
+            vectorizer_config=wvc.config.Configure.Vectorizer.none()
+        )
+        return self
+
+    def _batch(self):
+        if self.batch_size:
+            return self.collection.batch.fixed_size(
+                batch_size=self.batch_size, concurrent_requests=self.concurrent_requests
+            )
+        return self.collection.batch.dynamic()
+
+    def add(self, data):
+        self._require_reset(self.collection)
+        binary_fields = {f.name for f in data.schema if pa.types.is_binary(f.type)}
+
+        with self._batch() as batch:
+            for record_batch in data.to_batches(max_chunksize=self.chunk_rows):
+                dim = record_batch.schema.field("vector").type.list_size
+                vectors = record_batch.column("vector").flatten().to_numpy().reshape(-1, dim)
+                rows = record_batch.drop_columns(["vector"]).to_pylist()
+
+                for row, vector in zip(rows, vectors):
+                    properties = {}
+                    for key, value in row.items():
+                        if value is None:
+                            continue
+                        properties[key] = base64.b64encode(value).decode("ascii") if key in binary_fields else value
+                    batch.add_object(properties=properties, vector=vector.tolist())
+
+        failed = self.collection.batch.failed_objects
+        if failed:
+            print(f"⚠️ {len(failed)} objects failed to insert into {self.collection_name}: {failed[0].message}")
+
+    def count_rows(self):
+        return self._require_reset(self.collection).aggregate.over_all(total_count=True).total_count
+
+    def close(self):
+        self.client.close()
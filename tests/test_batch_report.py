@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from batch_report import iter_payloads, analyze_payload, analyze_payloads, report_format, write_report
+
+PAYLOAD = {"feature": {"attributes": {"customer": "Null", "site_visit_datetime": 1}, "geometry": {"x": 1, "y": 2}}}
+
+def test_iter_payloads_directory_records_bad_files(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps([PAYLOAD]))
+    (tmp_path / "b.json").write_text("{bad")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    items = list(iter_payloads(str(tmp_path)))
+
+    assert [i[0] for i in items] == ["a.json", "b.json"]
+    assert items[0] == ("a.json", PAYLOAD, "")
+    assert items[1][1] is None
+    assert items[1][2].startswith("JSONDecodeError")
+
+def test_iter_payloads_jsonl_unwraps_lists(tmp_path):
+    source = tmp_path / "batch.jsonl"
+    source.write_text(json.dumps([PAYLOAD]) + "\n\n" + json.dumps(PAYLOAD) + "\nnope\n")
+
+    items = list(iter_payloads(str(source)))
+
+    assert [i[0] for i in items] == ["batch.jsonl:1", "batch.jsonl:3", "batch.jsonl:4"]
+    assert items[0][1] == PAYLOAD
+    assert items[1][1] == PAYLOAD
+    assert items[2][1] is None and items[2][2]
+
+def test_analyze_payload_findings():
+    record = analyze_payload(("p1", PAYLOAD, ""))
+
+    assert record["error"] == ""
+    assert record["null_fields"] == "feature.attributes.customer"
+    assert record["type_summary"] == "geometry=1; number=1; text=1"
+    assert record["geometry_issue_count"] == 0
+
+def test_analyze_payload_error_rows():
+    parse_error = analyze_payload(("bad", None, "JSONDecodeError: x"))
+    not_object = analyze_payload(("str", "just a string", ""))
+
+    assert parse_error["error"] == "JSONDecodeError: x"
+    assert not_object["error"] == "Expected a JSON object, got str"
+    for record in (parse_error, not_object):
+        assert record["field_count"] == 0
+        assert record["null_fields"] == ""
+
+def test_analyze_payloads_keeps_going_after_bad_file(tmp_path):
+    (tmp_path / "a.json").write_text("{bad")
+    (tmp_path / "b.json").write_text(json.dumps(PAYLOAD))
+
+    records = analyze_payloads(str(tmp_path), workers=1)
+
+    assert [bool(r["error"]) for r in records] == [True, False]
+
+def test_report_format_and_write(tmp_path):
+    assert report_format("r.CSV") == "csv"
+    assert report_format("r.txt") is None
+    with pytest.raises(ValueError):
+        write_report([], str(tmp_path / "r.txt"))
+
+    df = write_report([analyze_payload(("p1", PAYLOAD, ""))], str(tmp_path / "r.csv"))
+    assert list(df["payload_id"]) == ["p1"]
+    assert (tmp_path / "r.csv").exists()
@@ -0,0 +1,122 @@
+import struct
+
+from geometry_utils import is_geometry, summarize_geometry, compact_geometry, describe_geometry
+
+CW_SQUARE = [[0, 0], [0, 1], [1, 1], [1, 0], [0, 0]]
+CCW_HOLE = [[0.2, 0.2], [0.8, 0.2], [0.8, 0.8], [0.2, 0.8], [0.2, 0.2]]
+CW_SQUARE_2 = [[5, 5], [5, 6], [6, 6], [6, 5], [5, 5]]
+
+def header(wkb, offset=0):
+    return struct.unpack_from("<BI", wkb, offset)
+
+def test_is_geometry():
+    assert is_geometry({"x": 1, "y": 2})
+    assert is_geometry({"rings": []})
+    assert is_geometry({"paths": [[[0, 0], [1, 1]]]})
+    assert not is_geometry({"x": 1})
+    assert not is_geometry([[0, 0]])
+
+def test_point_wkb():
+    geom = summarize_geometry({"x": 1.5, "y": -2.0, "spatialReference": {"wkid": 4326}})
+    assert geom["wkb"] == struct.pack("<BIdd", 1, 1, 1.5, -2.0)
+    assert geom["bbox"] == [1.5, -2.0, 1.5, -2.0]
+    assert geom["vertex_count"] == 1
+    assert geom["is_valid"]
+
+def test_empty_point():
+    geom = summarize_geometry({"x": None, "y": None})
+    assert len(geom["wkb"]) == 21
+    assert geom["vertex_count"] == 0
+    assert geom["issues"] == ["geometry is empty"]
+
+def test_multipoint_wkb():
+    geom = summarize_geometry({"points": [[0, 0], [2, 3]]})
+    assert geom["wkb"] == (
+        struct.pack("<BII", 1, 4, 2)
+        + struct.pack("<BIdd", 1, 1, 0.0, 0.0)
+        + struct.pack("<BIdd", 1, 1, 2.0, 3.0)
+    )
+    assert geom["bbox"] == [0.0, 0.0, 2.0, 3.0]
+
+def test_polyline_wkb_drops_z():
+    geom = summarize_geometry({"paths": [[[0, 0, 9], [1, 1, 9]], [[2, 2], [3, 4]]]})
+    assert geom["wkb"] == (
+        struct.pack("<BII", 1, 5, 2)
+        + struct.pack("<BII4d", 1, 2, 2, 0, 0, 1, 1)
+        + struct.pack("<BII4d", 1, 2, 2, 2, 2, 3, 4)
+    )
+    assert geom["vertex_count"] == 4
+    assert geom["part_count"] == 2
+    assert geom["is_valid"]
+
+def test_polygon_with_hole_wkb():
+    geom = summarize_geometry({"rings": [CW_SQUARE, CCW_HOLE]})
+    wkb = geom["wkb"]
+    assert header(wkb) == (1, 3)
+    assert struct.unpack_from("<I", wkb, 5) == (2,)
+    assert struct.unpack_from("<I", wkb, 9) == (5,)
+    assert struct.unpack_from("<10d", wkb, 13) == tuple(float(v) for p in CW_SQUARE for v in p)
+    assert len(wkb) == 9 + (4 + 5 * 16) * 2
+    assert geom["is_valid"]
+
+def test_multi_part_polygon_is_multipolygon():
+    geom = summarize_geometry({"rings": [CW_SQUARE, CCW_HOLE, CW_SQUARE_2]})
+    wkb = geom["wkb"]
+    assert header(wkb) == (1, 6)
+    assert struct.unpack_from("<I", wkb, 5) == (2,)
+    # first polygon: exterior + hole
+    assert header(wkb, 9) == (1, 3)
+    assert struct.unpack_from("<I", wkb, 14) == (2,)
+    second = 9 + 9 + (4 + 5 * 16) * 2
+    assert header(wkb, second) == (1, 3)
+    assert struct.unpack_from("<I", wkb, second + 5) == (1,)
+    assert len(wkb) == second + 9 + 4 + 5 * 16
+    assert geom["bbox"] == [0.0, 0.0, 6.0, 6.0]
+
+def test_polygon_issues():
+    geom = summarize_geometry({"rings": [[[0, 0], [0, 1], [1, 1], [1, 0]], [[0, 0], [1, 1], [0, 0]]]})
+    assert "ring 0 is not closed" in geom["issues"]
+    assert "ring 1 has fewer than 4 vertices" in geom["issues"]
+    assert not geom["is_valid"]
+
+def test_counter_clockwise_exterior_flagged():
+    geom = summarize_geometry({"rings": [CCW_HOLE]})
+    assert geom["issues"] == ["first ring is not clockwise"]
+
+def test_null_parts_are_issues_not_errors():
+    geom = summarize_geometry({"rings": [None]})
+    assert geom["issues"] == ["ring 0 is null", "geometry is empty"]
+
+    geom = summarize_geometry({"rings": [CW_SQUARE, None]})
+    assert geom["issues"] == ["ring 1 is null"]
+    assert header(geom["wkb"]) == (1, 3)
+
+    geom = summarize_geometry({"paths": [[[0, 0], [1, 1]], None]})
+    assert geom["issues"] == ["path 1 is null"]
+    assert geom["vertex_count"] == 2
+
+def test_null_and_non_numeric_coordinates():
+    geom = summarize_geometry({"paths": [[[0, 0], [None, 1], ["a", 2], [3, 3]]]})
+    assert geom["issues"] == ["contains null or non-finite coordinates"]
+    assert geom["bbox"] == [0.0, 0.0, 3.0, 3.0]
+
+def test_describe_geometry():
+    text = describe_geometry(summarize_geometry({"rings": [CW_SQUARE]}))
+    assert text.startswith("polygon: 1 part(s), 5 vertices, bbox [0.000000")
+
+def test_compact_geometry_replaces_coordinates_with_summary():
+    ring = [[float(i), float(i % 7)] for i in range(1000)] + [[0.0, 0.0]]
+    payload = {"feature": {"attributes": {"geometry": "not a geometry"}, "geometry": {"rings": [ring]}}}
+    summaries = {}
+
+    compacted = compact_geometry(payload, summaries)
+
+    geometry = compacted["feature"]["geometry"]
+    assert "rings" not in geometry
+    assert geometry["type"] == "polygon"
+    assert geometry["vertex_count"] == 1001
+    assert geometry["bbox"] == [0.0, 0.0, 999.0, 6.0]
+    assert compacted["feature"]["attributes"] == {"geometry": "not a geometry"}
+    assert summaries[id(payload["feature"]["geometry"])]["vertex_count"] == 1001
+    # input is left untouched
+    assert payload["feature"]["geometry"]["rings"][0] is ring
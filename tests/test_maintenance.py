@@ -0,0 +1,43 @@
+import os
+import time
+from datetime import timedelta
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+lancedb = pytest.importorskip("lancedb")
+
+import maintenance
+
+def touch(path, age_seconds):
+    with open(path, "w") as f:
+        f.write("{}")
+    stamp = time.time() - age_seconds
+    os.utime(path, (stamp, stamp))
+    return str(path)
+
+def test_cleanup_uploads_keeps_listed_and_newest(tmp_path):
+    old = touch(tmp_path / "old.json", 7200)
+    kept = touch(tmp_path / "kept.json", 7200)
+    newest = touch(tmp_path / "newest.json", 3600)
+
+    removed, _ = maintenance.cleanup_uploads(str(tmp_path), timedelta(minutes=1), keep=[kept], keep_newest=True)
+
+    assert removed == 1
+    assert not os.path.exists(old)
+    assert os.path.exists(kept) and os.path.exists(newest)
+
+def test_cli_pass_does_not_break_other_handle_after_checkout(tmp_path):
+    db_path = str(tmp_path / "db")
+    app_table = lancedb.connect(db_path).create_table("qc_field_rules", data=pa.table({"field_name": ["a"]}))
+    for name in ["b", "c", "d"]:
+        app_table.add(pa.table({"field_name": [name]}))
+
+    # Separate handle, like `python maintenance.py` next to the running app
+    report = maintenance.run_maintenance(db_path=db_path, upload_folder=str(tmp_path / "uploads"),
+                                         retention=timedelta(0))
+    assert report["table"]["after"]["versions"] < report["table"]["before"]["versions"]
+
+    # What app.chat does before reading
+    app_table.checkout_latest()
+    assert sorted(app_table.search().select(["field_name"]).limit(None).to_arrow()["field_name"].to_pylist()) == list("abcd")
@@ -0,0 +1,79 @@
+import importlib
+import sys
+import types
+
+import numpy as np
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("lancedb")
+
+DIM = 384
+
+class FakeEmbeddingModel:
+    """Deterministic stand-in for MiniLM so tests do not download the model."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        matrix = np.array([np.full(DIM, len(t), dtype=np.float32) for t in texts]).reshape(len(texts), DIM)
+        return matrix[0] if single else matrix
+
+@pytest.fixture
+def preload(monkeypatch):
+    fake = types.ModuleType("sentence_transformers")
+    fake.SentenceTransformer = FakeEmbeddingModel
+    monkeypatch.setitem(sys.modules, "sentence_transformers", fake)
+    monkeypatch.delitem(sys.modules, "preload_database_lance", raising=False)
+    return importlib.import_module("preload_database_lance")
+
+def test_build_record_batch_matches_schema(preload):
+    columns = preload.new_columns()
+    texts = []
+    preload.append_row(columns, texts, "a text", field_name="a", expected_format="text", required=False)
+    preload.append_row(columns, texts, "b number", field_name="b", expected_format="number", required=True)
+
+    batch = preload.build_record_batch(columns, texts)
+
+    assert batch.schema.equals(preload.QC_SCHEMA)
+    assert batch.num_rows == 2
+    vector_type = batch.schema.field("vector").type
+    assert pa.types.is_fixed_size_list(vector_type)
+    assert vector_type.list_size == DIM
+    assert vector_type.value_type == pa.float32()
+    assert batch.column("vector")[1].values.to_numpy()[0] == len("b number")
+    # columns not given are null
+    assert batch.column("geometry_wkb").null_count == 2
+
+def test_loads_round_trip(preload, tmp_path):
+    table = preload.create_or_reset_collection(db_path=str(tmp_path))
+    payload = {
+        "attributes": {"customer": "Null", "site_visit_datetime": 1752604260000},
+        "geometry": {"rings": [[[0, 0], [0, 1], [1, 1], [1, 0], [0, 0]]]},
+    }
+    preload.preload_fields_from_json(table, payload)
+    preload.load_bot_instructions(table)
+
+    df = table.to_pandas()
+    assert set(df["field_category"]) == {"attributes", "geometry", "meta"}
+    assert set(df["expected_format"].str.lower()) == {"text", "number", "geometry"}
+    assert df.loc[df["field_name"] == "attributes.customer", "was_null"].item()
+    assert (df["field_name"] == "bot_instruction").sum() == 13
+
+def test_raw_payload_does_not_repeat_geometry(preload, tmp_path):
+    table = preload.create_or_reset_collection(db_path=str(tmp_path))
+    ring = [[float(i), float(i % 7)] for i in range(20000)] + [[0.0, 0.0]]
+    payload = {"attributes": {"customer": "x", "a": 1, "b": 2}, "geometry": {"rings": [ring]}}
+    preload.preload_fields_from_json(table, payload)
+
+    df = table.to_pandas()
+    assert df["raw_payload"].str.len().max() < 1000
+    row = df[df["field_name"] == "geometry"].iloc[0]
+    assert row["geometry_vertex_count"] == 20001
+    assert len(row["geometry_wkb"]) == 9 + 4 + 20001 * 16
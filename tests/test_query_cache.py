@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+lancedb = pytest.importorskip("lancedb")
+
+import query_cache
+
+DIM = 4
+
+def rows(names):
+    n = len(names)
+    return pa.table({
+        "field_name": names,
+        "bot_response": [f"about {name}" for name in names],
+        "priority_level": ["low"] * n,
+        "required": [False] * n,
+        "expected_format": ["text"] * n,
+        "field_key_type": ["general"] * n,
+        "raw_payload": ["x" * 1000] * n,
+        "vector": pa.FixedSizeListArray.from_arrays(
+            pa.array(np.random.rand(n * DIM).astype(np.float32)), DIM
+        ),
+    })
+
+@pytest.fixture
+def table(tmp_path):
+    db = lancedb.connect(str(tmp_path))
+    return db.create_table("qc_field_rules", data=rows(["a", "b", "c"]))
+
+def entries(table):
+    return query_cache._result_cache[table]["entries"]
+
+def test_repeat_search_hits_cache_and_drops_heavy_columns(table, monkeypatch):
+    query = np.full(DIM, 0.5, dtype=np.float32)
+    first = query_cache.cached_search(table, query, top_k=2)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("search should be served from cache")
+
+    monkeypatch.setattr(table, "search", fail)
+    # a vector in the same bucket reuses the entry
+    second = query_cache.cached_search(table, query + 0.001, top_k=2)
+
+    assert second.equals(first)
+    assert "vector" not in first.columns
+    assert "raw_payload" not in first.columns
+    assert set(query_cache.RESULT_COLUMNS) <= set(first.columns)
+
+def test_write_invalidates_entries(table):
+    query = np.full(DIM, 0.5, dtype=np.float32)
+    query_cache.cached_search(table, query, top_k=10)
+    assert len(entries(table)) == 1
+
+    table.add(rows(["d"]))
+
+    # the stale entry is dropped on the next lookup and fresh results include the new row
+    results = query_cache.cached_search(table, query, top_k=10)
+    assert query_cache._result_cache[table]["version"] == table.version
+    assert len(entries(table)) == 1
+    assert "d" in set(results["field_name"])
+
+def test_keys_separate_top_k_and_where_and_evict_lru(table, monkeypatch):
+    monkeypatch.setattr(query_cache, "RESULT_CACHE_SIZE", 2)
+    query = np.full(DIM, 0.5, dtype=np.float32)
+
+    query_cache.cached_search(table, query, top_k=1)
+    query_cache.cached_search(table, query, top_k=2)
+    query_cache.cached_search(table, query, top_k=1)  # refresh top_k=1
+    query_cache.cached_search(table, query, top_k=2, where="field_name = 'a'")
+
+    keys = list(entries(table))
+    assert len(keys) == 2
+    assert [k[1:3] for k in keys] == [(1, None), (2, "field_name = 'a'")]